@@ -1,5 +1,6 @@
-from .adp_vantage import ADPVantageAdapter
-
-REGISTRY: dict = {
-    "adp_vantage": ADPVantageAdapter,
+# Adapter classes by system name, as "module:Class" paths.  Nothing is
+# imported until a system is selected, so listing the available systems
+# doesn't load Playwright or any adapter module.
+REGISTRY: dict[str, str] = {
+    "adp_vantage": "hcm_tools.adapters.adp_vantage:ADPVantageAdapter",
 }
@@ -4,10 +4,12 @@ Selector defaults in config/adp_vantage.yaml are placeholders.
 Inspect your portal's DOM with DevTools and update the YAML before running.
 """
 
+import functools
 import logging
 import re
+import string
 from pathlib import Path
-from typing import List
+from typing import Any, List, Mapping, Optional, Tuple
 
 from playwright.async_api import Page, Download, TimeoutError as PlaywrightTimeoutError
 
@@ -18,110 +20,223 @@ logger = logging.getLogger(__name__)
 # URL fragments that indicate the session has expired / user was redirected to login
 _DEFAULT_EXPIRED_INDICATORS = ["/signin", "/login", "/sso", "auth/", "adfs/"]
 
+# Characters that are not safe in IDs / filenames
+_SLUG_RE = re.compile(r"[^\w\-]")
+
+# Same replacement as _SLUG_RE for pure-ASCII input, without the regex engine
+_SLUG_ALLOWED = frozenset(string.ascii_letters + string.digits + "_-")
+_SLUG_TABLE = {cp: "_" for cp in range(128) if chr(cp) not in _SLUG_ALLOWED}
+
+# Runs in the browser: returns the metadata text of every listing row at once
+_EXTRACT_ROWS_JS = """
+(rows, sels) => {
+    const text = (row, selector) => {
+        const el = row.querySelector(selector);
+        return el ? el.innerText.trim() : "";
+    };
+    return rows.map(row => ({
+        employee_name: text(row, sels.employee_name),
+        employee_id:   text(row, sels.employee_id),
+        doc_type:      text(row, sels.doc_type),
+        doc_date:      text(row, sels.doc_date),
+        has_download:  row.querySelector(sels.download_button) !== null,
+    }));
+}
+"""
+
+# Runs in the browser: text of the first listing row ("" if there is none)
+_FIRST_ROW_TEXT_JS = """
+(selector) => {
+    const row = document.querySelector(selector);
+    return row ? row.innerText : "";
+}
+"""
+
+# Runs in the browser: true once a first listing row exists and differs from
+# *before* (a cleared table mid-render doesn't count as the new page)
+_ROWS_CHANGED_JS = """
+([selector, before]) => {
+    const row = document.querySelector(selector);
+    return row !== null && row.innerText !== before;
+}
+"""
+
 
 class ADPVantageAdapter(BaseAdapter):
     """Adapter for ADP Vantage document portals."""
 
-    def __init__(self, config: dict, page: Page):
+    def __init__(self, config: Mapping[str, Any], page: Page):
         super().__init__(config, page)
         self._sel = config["selectors"]
+        doc_sel = self._sel["document_list"]
+        pag_sel = self._sel["pagination"]
+        # Resolved once here rather than via nested dict lookups on every call
+        self._sel_rows:     str = doc_sel["rows"]
+        self._sel_dl:       str = doc_sel["download_button"]
+        self._sel_has_next: str = pag_sel["has_next"]
+        self._sel_next_btn: str = pag_sel["next_button"]
+        # Per-row field selectors handed to _EXTRACT_ROWS_JS
+        self._row_field_sels: dict = {
+            key: doc_sel[key]
+            for key in ("employee_name", "employee_id", "doc_type", "doc_date", "download_button")
+        }
         self._timeout: int = config.get("download", {}).get("timeout", 30_000)
         self._docs_url: str = config.get("documents_url") or config["base_url"]
-        self._expired_indicators: List[str] = (
-            config.get("session", {}).get("expired_indicators", _DEFAULT_EXPIRED_INDICATORS)
+        # Optional direct link to a listing page, e.g. ".../documents?page={page}"
+        self._docs_page_url: Optional[str] = config.get("documents_page_url")
+        self._expired_indicators: Tuple[str, ...] = tuple(
+            indicator.lower()
+            for indicator in config.get("session", {}).get(
+                "expired_indicators", _DEFAULT_EXPIRED_INDICATORS
+            )
         )
+        # One alternation scans the URL once instead of once per indicator
+        self._expired_re: Optional[re.Pattern] = (
+            re.compile("|".join(map(re.escape, self._expired_indicators)))
+            if self._expired_indicators else None
+        )
+        # Listing page this adapter's page is currently showing (0 = unknown)
+        self._current_listing_page: int = 0
 
     # ── Navigation ────────────────────────────────────────────────────────
 
     async def navigate_to_documents(self) -> None:
         logger.debug(f"Navigating to documents page: {self._docs_url}")
-        await self.page.goto(self._docs_url)
-        await self.page.wait_for_load_state("networkidle", timeout=self._timeout)
+        await self._goto_listing(self._docs_url, 1)
+
+    async def _goto_listing(self, url: str, page_num: int) -> None:
+        """Load *url* and wait until the listing rows are rendered."""
+        self._current_listing_page = 0
+        await self.page.goto(url, wait_until="domcontentloaded")
+        # Ready as soon as the listing rows render — "networkidle" would also
+        # wait out analytics beacons and other traffic we never use.
+        try:
+            await self.page.wait_for_selector(self._sel_rows, timeout=self._timeout)
+        except PlaywrightTimeoutError:
+            # Empty listing or a login redirect — callers check for both.
+            logger.debug(f"No document rows after loading listing page {page_num}.")
+        self._current_listing_page = page_num
 
     async def go_to_listing_page(self, page_num: int) -> None:
-        """Navigate from page 1 to *page_num* by clicking Next repeatedly."""
-        await self.navigate_to_documents()
-        for _ in range(page_num - 1):
+        """
+        Navigate to listing page *page_num*.
+
+        Uses ``documents_page_url`` from the config when set.  Otherwise
+        clicks Next from the current page (when it is before *page_num*) or
+        from page 1.  No-op if the page is already showing *page_num*.
+        """
+        if page_num == self._current_listing_page:
+            return
+
+        if self._docs_page_url:
+            url = self._docs_page_url.format(page=page_num)
+            logger.debug(f"Navigating directly to listing page {page_num}: {url}")
+            await self._goto_listing(url, page_num)
+            return
+
+        if not 0 < self._current_listing_page < page_num:
+            await self.navigate_to_documents()
+        for _ in range(page_num - self._current_listing_page):
             if not await self.has_next_page():
                 logger.warning(f"Could not reach listing page {page_num} — ran out of pages.")
                 break
             await self.go_to_next_page()
+            if not self._current_listing_page:
+                # Don't keep clicking Next from a page we can't identify
+                raise PlaywrightTimeoutError(
+                    f"Could not confirm navigation towards listing page {page_num}"
+                )
 
     # ── Scraping ──────────────────────────────────────────────────────────
 
     async def get_documents_on_page(self, listing_page: int) -> List[DocumentRecord]:
-        sel = self._sel["document_list"]
         try:
-            await self.page.wait_for_selector(sel["rows"], timeout=self._timeout)
+            await self.page.wait_for_selector(self._sel_rows, timeout=self._timeout)
         except PlaywrightTimeoutError:
             logger.warning("No document rows found on current listing page.")
             return []
 
-        rows = await self.page.query_selector_all(sel["rows"])
+        # Extract every row's fields in a single JS evaluation rather than
+        # several CDP round-trips per row.
+        rows = await self.page.eval_on_selector_all(
+            self._sel_rows, _EXTRACT_ROWS_JS, self._row_field_sels
+        )
         records: List[DocumentRecord] = []
 
         for idx, row in enumerate(rows):
-            try:
-                employee_name = await _text(row, sel["employee_name"]) or "unknown"
-                employee_id   = await _text(row, sel["employee_id"])   or f"row{idx}"
-                doc_type      = await _text(row, sel["doc_type"])      or "document"
-                doc_date      = await _text(row, sel["doc_date"])      or ""
-                dl_el         = await row.query_selector(sel["download_button"])
-
-                if dl_el is None:
-                    logger.debug(f"Row {idx}: no download button found, skipping.")
-                    continue
-
-                records.append(
-                    DocumentRecord(
-                        id=_make_id(employee_id, doc_type, doc_date),
-                        employee_name=employee_name,
-                        employee_id=employee_id,
-                        doc_type=doc_type,
-                        doc_date=doc_date,
-                        listing_page=listing_page,
-                        row_index=idx,
-                    )
+            if not row["has_download"]:
+                logger.debug(f"Row {idx}: no download button found, skipping.")
+                continue
+
+            employee_name = row["employee_name"] or "unknown"
+            employee_id   = row["employee_id"]   or f"row{idx}"
+            doc_type      = row["doc_type"]      or "document"
+            doc_date      = row["doc_date"]      or ""
+
+            records.append(
+                DocumentRecord(
+                    id=_make_id(employee_id, doc_type, doc_date),
+                    employee_name=employee_name,
+                    employee_id=employee_id,
+                    doc_type=doc_type,
+                    doc_date=doc_date,
+                    listing_page=listing_page,
+                    row_index=idx,
                 )
-            except Exception as exc:
-                logger.warning(f"Row {idx}: parse error — {exc}")
+            )
 
         return records
 
     # ── Pagination ────────────────────────────────────────────────────────
 
     async def has_next_page(self) -> bool:
-        sel = self._sel["pagination"]["has_next"]
-        return await self.page.query_selector(sel) is not None
+        return await self.page.query_selector(self._sel_has_next) is not None
 
     async def go_to_next_page(self) -> None:
-        sel = self._sel["pagination"]["next_button"]
-        await self.page.click(sel)
-        await self.page.wait_for_load_state("networkidle", timeout=self._timeout)
+        next_page = self._current_listing_page + 1 if self._current_listing_page else 0
+        self._current_listing_page = 0
+        # The old page's rows stay in the DOM until the new ones replace them,
+        # so wait for the first row's content to change rather than for the
+        # row selector to match.
+        before = await self.page.evaluate(_FIRST_ROW_TEXT_JS, self._sel_rows)
+        await self.page.click(self._sel_next_btn)
+        try:
+            await self.page.wait_for_function(
+                _ROWS_CHANGED_JS, arg=[self._sel_rows, before], timeout=self._timeout
+            )
+        except PlaywrightTimeoutError:
+            # e.g. an empty next page, or one starting with an identical row.
+            # Carry on rather than abort the whole scrape, but leave the page
+            # number unknown (0) so nothing relies on where the browser is.
+            logger.warning("Listing rows did not change after clicking Next.")
+            return
+        self._current_listing_page = next_page
 
     # ── Download ──────────────────────────────────────────────────────────
 
     async def download_document(self, record: DocumentRecord, output_dir: str) -> str:
-        # Navigate this worker's page to the correct listing page
+        try:
+            return await self._download(record, output_dir)
+        except Exception:
+            # The page may be anywhere now (login redirect, half-loaded listing)
+            # — force a full re-navigation on the next attempt.
+            self._current_listing_page = 0
+            raise
+
+    async def _download(self, record: DocumentRecord, output_dir: str) -> str:
+        # Navigate this worker's page to the correct listing page (no-op when
+        # the previous download was on the same page)
         await self.go_to_listing_page(record.listing_page)
 
         # Check for session expiry immediately after navigation
         if await self.is_session_expired():
             raise RuntimeError("Session expired during navigation.")
 
-        # Re-locate the row by index (no stale element handles)
-        sel = self._sel["document_list"]
-        rows = await self.page.query_selector_all(sel["rows"])
-
-        if record.row_index >= len(rows):
-            raise IndexError(
-                f"Row {record.row_index} out of range "
-                f"(page has {len(rows)} rows) for doc {record.id}"
-            )
-
-        row = rows[record.row_index]
-        dl_el = await row.query_selector(sel["download_button"])
-        if dl_el is None:
+        # Re-locate the row by index (no stale element handles).  Locators
+        # resolve lazily, so only the target row is looked up.
+        row = self.page.locator(self._sel_rows).nth(record.row_index)
+        dl_el = row.locator(self._sel_dl).first
+        if await dl_el.count() == 0:
             raise RuntimeError(
                 f"Download button not found at row {record.row_index} for {record.id}"
             )
@@ -146,24 +261,36 @@ class ADPVantageAdapter(BaseAdapter):
     # ── Session health ─────────────────────────────────────────────────────
 
     async def is_session_expired(self) -> bool:
-        current_url = self.page.url.lower()
-        return any(indicator in current_url for indicator in self._expired_indicators)
+        if self._expired_re is None:
+            return False
+        return self._expired_re.search(self.page.url.lower()) is not None
+
+    async def has_active_session(self, timeout: int) -> bool:
+        # Positive signal: the listing rows render.  A URL check right after
+        # load would run before any JS / SSO redirect to the login page.
+        self._current_listing_page = 0
+        await self.page.goto(self._docs_url, wait_until="domcontentloaded")
+        try:
+            await self.page.wait_for_selector(self._sel_rows, timeout=timeout)
+        except PlaywrightTimeoutError:
+            return False
+        if await self.is_session_expired():
+            return False
+        self._current_listing_page = 1
+        return True
 
 
 # ── Internal helpers ────────────────────────────────────────────────────────
 
-async def _text(element, selector: str) -> str:
-    """Return stripped inner text of a child element, or empty string."""
-    el = await element.query_selector(selector)
-    return (await el.inner_text()).strip() if el else ""
-
-
 def _make_id(*parts: str) -> str:
     return "_".join(_slug(p) for p in parts if p)
 
 
+@functools.lru_cache(maxsize=4096)
 def _slug(value: str) -> str:
-    return re.sub(r"[^\w\-]", "_", value).strip("_")
+    if value.isascii():
+        return value.translate(_SLUG_TABLE).strip("_")
+    return _SLUG_RE.sub("_", value).strip("_")
 
 
 def _safe_filename(*parts: str) -> str:
@@ -2,7 +2,7 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Mapping
 
 from playwright.async_api import Page
 
@@ -39,7 +39,7 @@ class BaseAdapter(ABC):
     within the same authenticated browser context.
     """
 
-    def __init__(self, config: dict, page: Page):
+    def __init__(self, config: Mapping[str, Any], page: Page):
         self.config = config
         self.page = page
 
@@ -94,3 +94,12 @@ class BaseAdapter(ABC):
         Return True if the browser has been redirected to a login / SSO page,
         indicating the authenticated session has timed out.
         """
+
+    async def has_active_session(self, timeout: int) -> bool:
+        """
+        Load the document listing and return True only if it actually renders
+        within *timeout* ms — used to reuse a session from a saved profile.
+        Adapters should override this with a positive check of their own.
+        """
+        await self.navigate_to_documents()
+        return not await self.is_session_expired()
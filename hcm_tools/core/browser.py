@@ -3,12 +3,15 @@
 import asyncio
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import List, Mapping, Optional
 
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright, Route
 
 logger = logging.getLogger(__name__)
 
+# Resource types the adapters never read — aborted when block_assets is on
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet"})
+
 
 class BrowserSession:
     """Async context manager that owns a Playwright browser session."""
@@ -16,14 +19,20 @@ class BrowserSession:
     def __init__(
         self,
         headless: bool = False,
-        slow_mo: int = 50,
+        slow_mo: int = 0,             # debug only: ms pause between actions
         downloads_path: Optional[str] = None,
-        viewport: Optional[dict] = None,
+        viewport: Optional[Mapping[str, int]] = None,
+        block_assets: bool = False,
+        user_data_dir: Optional[str] = None,
     ):
         self.headless = headless
         self.slow_mo = slow_mo
         self.downloads_path = downloads_path
-        self.viewport = viewport or {"width": 1280, "height": 900}
+        # Copied to a plain dict: Playwright only serialises real dicts
+        self.viewport = dict(viewport) if viewport else {"width": 1280, "height": 900}
+        self.block_assets = block_assets
+        # When set, cookies/storage persist here so later runs stay logged in
+        self.user_data_dir = user_data_dir
 
         self._playwright: Optional[Playwright] = None
         self._browser: Optional[Browser] = None
@@ -32,10 +41,6 @@ class BrowserSession:
 
     async def __aenter__(self) -> "BrowserSession":
         self._playwright = await async_playwright().start()
-        self._browser = await self._playwright.chromium.launch(
-            headless=self.headless,
-            slow_mo=self.slow_mo,
-        )
 
         context_kwargs: dict = {
             "viewport": self.viewport,
@@ -44,8 +49,27 @@ class BrowserSession:
         if self.downloads_path:
             Path(self.downloads_path).mkdir(parents=True, exist_ok=True)
 
-        self._context = await self._browser.new_context(**context_kwargs)
-        self._page = await self._context.new_page()
+        if self.user_data_dir:
+            # Persistent context: no separate Browser object, and the profile
+            # usually opens with one blank page already.
+            Path(self.user_data_dir).mkdir(parents=True, exist_ok=True)
+            self._context = await self._playwright.chromium.launch_persistent_context(
+                self.user_data_dir,
+                headless=self.headless,
+                slow_mo=self.slow_mo,
+                **context_kwargs,
+            )
+        else:
+            self._browser = await self._playwright.chromium.launch(
+                headless=self.headless,
+                slow_mo=self.slow_mo,
+            )
+            self._context = await self._browser.new_context(**context_kwargs)
+
+        if self.block_assets:
+            await self._context.route("**/*", _block_assets)
+        pages = self._context.pages
+        self._page = pages[0] if pages else await self._context.new_page()
         logger.debug("Browser session started.")
         return self
 
@@ -75,6 +99,13 @@ class BrowserSession:
         """Create a new page within the shared context (inherits session cookies)."""
         return await self.context.new_page()
 
+    async def acquire_pages(self, n: int) -> List[Page]:
+        """
+        Open *n* pages in the shared context concurrently — one per download
+        worker.  All of them share the authenticated session cookies.
+        """
+        return list(await asyncio.gather(*(self.new_page() for _ in range(n))))
+
     async def navigate(self, url: str, wait_until: str = "domcontentloaded") -> None:
         logger.info(f"Navigating to {url}")
         await self.page.goto(url, wait_until=wait_until)
@@ -92,3 +123,11 @@ class BrowserSession:
         await asyncio.get_event_loop().run_in_executor(None, input, "  Press ENTER to continue... ")
         print()
         logger.info("User confirmed login — resuming automation.")
+
+
+async def _block_assets(route: Route) -> None:
+    """Abort requests for images/fonts/media/stylesheets; let everything else through."""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
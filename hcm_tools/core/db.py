@@ -1,14 +1,37 @@
 """SQLite-backed download state — replaces the JSON state file."""
 
+import asyncio
 import logging
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set
 
 import aiosqlite
 
+if TYPE_CHECKING:
+    from ..adapters.base import DocumentRecord
+
 logger = logging.getLogger(__name__)
 
+# Status updates are committed in batches: at most this many seconds apart …
+_FLUSH_INTERVAL = 0.5
+# … or as soon as this many uncommitted updates have accumulated.
+_FLUSH_EVERY = 50
+
+# Insert-or-keep that reports each document's status in the same statement.
+# The no-op DO UPDATE makes RETURNING emit rows for existing ids too.
+_UPSERT_SQL = """
+    INSERT INTO documents
+        (id, employee_name, employee_id, doc_type, doc_date,
+         listing_page, row_index, discovered_at)
+    VALUES {values}
+    ON CONFLICT(id) DO UPDATE SET status=status
+    RETURNING id, status
+"""
+_UPSERT_ROW = "(?, ?, ?, ?, ?, ?, ?, ?)"
+# Rows per multi-row upsert — keeps bound parameters well under SQLite's limit
+_UPSERT_CHUNK = 500
+
 
 class DownloadDB:
     """
@@ -19,24 +42,61 @@ class DownloadDB:
     ------
     documents  — one row per discovered document; tracks status + retry count.
     run_state  — key/value pairs for global state (e.g. last pagination page).
+
+    Per-document status updates (``mark_*``) are not committed individually;
+    a background task commits them every *flush_interval* seconds (or every
+    *flush_every* updates), and ``close()`` commits the remainder.
+
+    Reads and writes deliberately share one connection: buffered updates are
+    only visible on the connection that made them, so separate reader
+    connections would see stale statuses.  The hot-path read (is this
+    document done?) is served from memory by the downloader instead.
     """
 
     STATUS_PENDING     = "pending"
-    STATUS_IN_PROGRESS = "in_progress"
+    STATUS_IN_PROGRESS = "in_progress"   # legacy: only in databases from older versions
     STATUS_COMPLETED   = "completed"
     STATUS_FAILED      = "failed"
 
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        cache_size_mb: int = 64,
+        mmap_size_mb: int = 256,
+        flush_interval: float = _FLUSH_INTERVAL,
+        flush_every: int = _FLUSH_EVERY,
+    ):
         self.db_path = db_path
+        self.cache_size_mb = cache_size_mb
+        self.mmap_size_mb = mmap_size_mb
+        self.flush_interval = flush_interval
+        self.flush_every = max(1, flush_every)
         self._db: Optional[aiosqlite.Connection] = None
+        self._pending_writes = 0
+        self._flush_task: Optional[asyncio.Task] = None
+        # Serialises commits from the flush loop and _write_done
+        self._flush_lock = asyncio.Lock()
 
     async def open(self) -> None:
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         self._db = await aiosqlite.connect(self.db_path)
         self._db.row_factory = aiosqlite.Row
-        await self._db.execute("PRAGMA journal_mode=WAL")
+        async with self._db.execute("PRAGMA journal_mode=WAL") as cur:
+            mode = (await cur.fetchone())[0]
+        if mode.lower() != "wal":
+            # e.g. network filesystems, where SQLite can't use shared memory
+            logger.warning(
+                f"SQLite WAL mode unavailable for {self.db_path} "
+                f"(journal_mode={mode}); concurrent access will be slower."
+            )
+        await self._db.execute("PRAGMA busy_timeout=5000")
         await self._db.execute("PRAGMA synchronous=NORMAL")
+        # Keep the working set in memory: negative cache_size is in KiB
+        await self._db.execute(f"PRAGMA cache_size=-{int(self.cache_size_mb) * 1024}")
+        await self._db.execute(f"PRAGMA mmap_size={int(self.mmap_size_mb) * 1024 * 1024}")
+        await self._db.execute("PRAGMA temp_store=MEMORY")
         await self._create_tables()
+        self._flush_task = asyncio.create_task(self._flush_loop())
         summary = await self.get_summary()
         logger.info(
             f"Database opened: {self.db_path} "
@@ -44,9 +104,47 @@ class DownloadDB:
         )
 
     async def close(self) -> None:
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            except Exception as exc:
+                logger.warning(f"Background commit task failed: {exc}")
+            self._flush_task = None
         if self._db:
-            await self._db.close()
-            self._db = None
+            try:
+                await self.flush()
+            finally:
+                await self._db.close()
+                self._db = None
+
+    async def flush(self) -> None:
+        """Commit any buffered status updates."""
+        async with self._flush_lock:
+            pending = self._pending_writes
+            if pending:
+                await self._db.commit()
+                # Only forget the updates once they are committed; more may
+                # have been buffered while the commit was in flight.
+                self._pending_writes -= pending
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as exc:
+                # e.g. "database is locked" past busy_timeout — the updates
+                # stay pending and are retried on the next tick.
+                logger.warning(f"Periodic commit failed, will retry: {exc}")
+
+    async def _write_done(self) -> None:
+        """Record a buffered update; commit early once enough have piled up."""
+        self._pending_writes += 1
+        if self._pending_writes >= self.flush_every:
+            await self.flush()
 
     async def _create_tables(self) -> None:
         await self._db.executescript("""
@@ -69,9 +167,15 @@ class DownloadDB:
             CREATE INDEX IF NOT EXISTS idx_documents_status
                 ON documents(status);
 
+            -- Pending work in listing order, without a sort step
+            CREATE INDEX IF NOT EXISTS idx_documents_pending
+                ON documents(status, listing_page, row_index)
+                WHERE status='pending';
+
+            -- value is untyped so each key keeps its natural SQLite type
             CREATE TABLE IF NOT EXISTS run_state (
                 key   TEXT PRIMARY KEY,
-                value TEXT NOT NULL
+                value NOT NULL
             );
         """)
         await self._db.commit()
@@ -101,6 +205,28 @@ class DownloadDB:
         )
         await self._db.commit()
 
+    async def register_documents_bulk(
+        self, records: Sequence["DocumentRecord"]
+    ) -> Dict[str, str]:
+        """
+        Insert a batch of documents in one transaction (existing ids are left
+        untouched) and return ``{doc_id: status}`` for every record.
+        """
+        now = _now()
+        statuses: Dict[str, str] = {}
+        for start in range(0, len(records), _UPSERT_CHUNK):
+            chunk = records[start:start + _UPSERT_CHUNK]
+            params: List[Any] = []
+            for r in chunk:
+                params += (r.id, r.employee_name, r.employee_id, r.doc_type,
+                           r.doc_date, r.listing_page, r.row_index, now)
+            sql = _UPSERT_SQL.format(values=", ".join([_UPSERT_ROW] * len(chunk)))
+            async with self._db.execute(sql, params) as cur:
+                for row in await cur.fetchall():
+                    statuses[row["id"]] = row["status"]
+        await self._db.commit()
+        return statuses
+
     # ── Status queries ─────────────────────────────────────────────────────
 
     async def is_completed(self, doc_id: str) -> bool:
@@ -109,6 +235,13 @@ class DownloadDB:
         ) as cur:
             return await cur.fetchone() is not None
 
+    async def get_completed_ids(self) -> Set[str]:
+        """Ids of every completed document, loaded in one query."""
+        async with self._db.execute(
+            "SELECT id FROM documents WHERE status='completed'"
+        ) as cur:
+            return {row["id"] for row in await cur.fetchall()}
+
     async def get_attempts(self, doc_id: str) -> int:
         async with self._db.execute(
             "SELECT attempts FROM documents WHERE id=?", (doc_id,)
@@ -118,46 +251,46 @@ class DownloadDB:
 
     # ── Status mutations ───────────────────────────────────────────────────
 
-    async def mark_in_progress(self, doc_id: str) -> None:
-        await self._db.execute(
-            "UPDATE documents SET status='in_progress', attempts=attempts+1 WHERE id=?",
-            (doc_id,),
-        )
-        await self._db.commit()
-
     async def mark_completed(self, doc_id: str, file_path: str) -> None:
         await self._db.execute(
             """
             UPDATE documents
-               SET status='completed', file_path=?, completed_at=?, last_error=NULL
+               SET status='completed', attempts=attempts+1,
+                   file_path=?, completed_at=?, last_error=NULL
              WHERE id=?
             """,
             (file_path, _now(), doc_id),
         )
-        await self._db.commit()
+        await self._write_done()
 
     async def mark_failed(self, doc_id: str, error: str) -> None:
         await self._db.execute(
-            "UPDATE documents SET status='failed', last_error=? WHERE id=?",
+            "UPDATE documents SET status='failed', attempts=attempts+1, last_error=? WHERE id=?",
             (error, doc_id),
         )
-        await self._db.commit()
+        await self._write_done()
 
     # ── Run-level state ────────────────────────────────────────────────────
 
     async def get_last_page(self) -> int:
         async with self._db.execute(
-            "SELECT value FROM run_state WHERE key='last_page'"
+            # CAST is a no-op for integer values; it only matters for
+            # databases created when run_state.value was a TEXT column.
+            "SELECT CAST(value AS INTEGER) AS value FROM run_state WHERE key='last_page'"
         ) as cur:
             row = await cur.fetchone()
-            return int(row["value"]) if row else 1
+            return row["value"] if row else 1
 
     async def set_last_page(self, page: int) -> None:
+        """
+        Buffered like the ``mark_*`` updates: it is committed together with
+        the next write that commits (normally that page's bulk registration).
+        """
         await self._db.execute(
             "INSERT OR REPLACE INTO run_state (key, value) VALUES ('last_page', ?)",
-            (str(page),),
+            (page,),
         )
-        await self._db.commit()
+        await self._write_done()
 
     async def reset(self) -> None:
         await self._db.execute("DELETE FROM documents")
@@ -167,28 +300,34 @@ class DownloadDB:
 
     # ── Summary ────────────────────────────────────────────────────────────
 
-    async def get_summary(self) -> Dict[str, Any]:
+    async def get_summary(self) -> Dict[str, int]:
+        """Document counts per status, computed in a single pass."""
         async with self._db.execute(
-            "SELECT status, COUNT(*) AS n FROM documents GROUP BY status"
+            """
+            SELECT COALESCE(SUM(status='completed'), 0)   AS completed,
+                   COALESCE(SUM(status='failed'), 0)      AS failed,
+                   COALESCE(SUM(status='in_progress'), 0) AS in_progress,
+                   COALESCE(SUM(status='pending'), 0)     AS pending
+              FROM documents
+            """
         ) as cur:
-            counts = {row["status"]: row["n"] for row in await cur.fetchall()}
+            return dict(await cur.fetchone())
 
+    async def get_failed_details(
+        self, limit: Optional[int] = None, offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Failed documents with their last error; all of them unless *limit* is given."""
         async with self._db.execute(
             """
             SELECT id, employee_name, employee_id, doc_type, doc_date,
                    attempts, last_error
               FROM documents WHERE status='failed'
-            """
+             ORDER BY listing_page, row_index
+             LIMIT ? OFFSET ?
+            """,
+            (-1 if limit is None else limit, offset),
         ) as cur:
-            failed_details: List[Dict] = [dict(r) for r in await cur.fetchall()]
-
-        return {
-            "completed":     counts.get("completed", 0),
-            "failed":        counts.get("failed", 0),
-            "in_progress":   counts.get("in_progress", 0),
-            "pending":       counts.get("pending", 0),
-            "failed_details": failed_details,
-        }
+            return [dict(r) for r in await cur.fetchall()]
 
 
 def _now() -> str:
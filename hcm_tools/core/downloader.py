@@ -3,37 +3,50 @@ Concurrent bulk download orchestrator.
 
 Architecture
 ------------
-Phase 1 — Scrape
+Scrape and download run concurrently, so wall time is roughly
+max(scrape, download) rather than the sum.
+
+Scrape (producer)
     A single page (the main authenticated page) iterates through all listing
     pages and registers every DocumentRecord into the database.  Records that
-    haven't been completed yet are pushed onto an asyncio.Queue.
+    haven't been completed yet are pushed onto a bounded asyncio.Queue as each
+    page is scraped; when the listing is exhausted one ``_SENTINEL`` end
+    marker is queued per worker.
 
-Phase 2 — Download (concurrent)
-    N worker coroutines drain the queue.  Each worker owns its own Playwright
-    Page (created from the shared browser context, so it inherits the session
-    cookies).  Workers run independently and share a RateLimiter.
+Download (N concurrent consumers)
+    N worker coroutines drain the queue until they receive the end marker.
+    Each worker owns its own Playwright Page (all opened up front from the
+    shared browser context, so they inherit the session cookies).  Workers
+    run independently and share a RateLimiter.
 
 Session timeout
     When a worker detects a login redirect it acquires a lock, pauses all
     workers via an asyncio.Event, prompts the user to re-authenticate in the
     browser, then releases the event so workers resume.  The failed download
-    is re-queued for retry.
+    is set aside on a retry list that workers drain before the queue.  The
+    scraper takes the same path when a listing page comes back empty or
+    without a next link on a login page, then re-scrapes that page.
 """
 
 import asyncio
+import concurrent.futures
 import logging
 import random
-from typing import Tuple, Type
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple, Type
 
-from playwright.async_api import BrowserContext
+from playwright.async_api import Page
 
+from .browser import BrowserSession
 from .db import DownloadDB
 from .rate_limiter import RateLimiter
-from .retry import with_retry
+from .retry import backoff_schedule, with_retry
 from ..adapters.base import BaseAdapter, DocumentRecord
 
 logger = logging.getLogger(__name__)
 
+# End-of-work marker: the scraper queues one per worker once the listing is done
+_SENTINEL: Any = object()
+
 
 class BulkDownloader:
 
@@ -41,13 +54,13 @@ class BulkDownloader:
         self,
         adapter_class: Type[BaseAdapter],
         scrape_adapter: BaseAdapter,   # pre-authenticated adapter on the main page
-        context: BrowserContext,       # shared browser context for worker pages
+        session: BrowserSession,       # owns the shared context for worker pages
         db: DownloadDB,
-        config: dict,
+        config: Mapping[str, Any],
     ):
         self.adapter_class  = adapter_class
         self.scrape_adapter = scrape_adapter
-        self.context        = context
+        self.session        = session
         self.db             = db
         self.config         = config
 
@@ -63,6 +76,10 @@ class BulkDownloader:
         self.max_attempts:     int   = retry_cfg.get("max_attempts", 3)
         self.retry_base_delay: float = retry_cfg.get("base_delay", 2.0)
         self.retry_max_delay:  float = retry_cfg.get("max_delay", 60.0)
+        # Same for every document, so compute the backoff delays once
+        self._retry_delays = backoff_schedule(
+            self.max_attempts, self.retry_base_delay, self.retry_max_delay
+        )
 
         max_per_min = rate_cfg.get("downloads_per_minute", 30)
         self.rate_limiter = RateLimiter(max_calls=max_per_min, window=60.0)
@@ -71,46 +88,78 @@ class BulkDownloader:
         self._session_ok    = asyncio.Event()
         self._session_ok.set()
         self._reauth_lock   = asyncio.Lock()
+        # Dedicated thread for the blocking re-auth input() so it never ties
+        # up a default-executor thread that other async I/O relies on.
+        self._prompt_exec = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="reauth"
+        )
+
+        # Completed document ids, kept in memory so workers can skip finished
+        # records without a database round-trip.  Loaded at the start of run().
+        self._completed: Set[str] = set()
+
+        # Records interrupted by a session timeout, retried before the queue.
+        # Kept outside the bounded queue so re-queuing can never block.
+        self._requeued: List[DocumentRecord] = []
+
+        # Records that hit a session timeout while re-auth is pending, keyed
+        # by id so each one is re-queued exactly once when the session returns.
+        self._reauth_pending: Dict[str, DocumentRecord] = {}
 
     # ── Public entry point ─────────────────────────────────────────────────
 
     async def run(self, start_page: int = 1) -> Tuple[int, int, int]:
         """
-        Scrape all listing pages, then download concurrently.
+        Scrape all listing pages while downloading concurrently.
         Returns (downloaded, skipped, failed).
         """
-        queue: asyncio.Queue[DocumentRecord] = asyncio.Queue()
-
-        # Phase 1: scrape
-        total = await self._scrape_all(queue, start_page)
-        logger.info(
-            f"Discovered {total} document(s). "
-            f"Starting {self.n_workers} download worker(s)."
+        # Bounded so the scraper can't run arbitrarily far ahead of downloads
+        queue: asyncio.Queue[DocumentRecord] = asyncio.Queue(
+            maxsize=self.n_workers * 4
         )
-
-        # Phase 2: concurrent download
-        tasks = [
-            asyncio.create_task(self._worker(i, queue))
-            for i in range(self.n_workers)
-        ]
-        results = await asyncio.gather(*tasks, return_exceptions=False)
+        self._completed = await self.db.get_completed_ids()
+        self._requeued = []
+        self._reauth_pending = {}
+
+        # Start the workers first: they begin downloading as soon as the
+        # first listing page has been scraped.
+        # The TaskGroup cancels every worker (closing its page) as soon as the
+        # scraper or any worker raises, instead of leaving siblings running.
+        pages = await self.session.acquire_pages(self.n_workers)
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(self._worker(i, page, queue))
+                for i, page in enumerate(pages)
+            ]
+            logger.info("Started %d download worker(s).", self.n_workers)
+
+            total = await self._scrape_all(queue, start_page)
+            for _ in tasks:
+                await queue.put(_SENTINEL)
+            logger.info("Discovered %d document(s).", total)
+
+        results = [t.result() for t in tasks]
 
         downloaded = sum(r[0] for r in results)
         skipped    = sum(r[1] for r in results)
         failed     = sum(r[2] for r in results)
 
         logger.info(
-            f"Run complete — downloaded: {downloaded}, "
-            f"skipped: {skipped}, failed: {failed}"
+            "Run complete — downloaded: %d, skipped: %d, failed: %d",
+            downloaded, skipped, failed,
         )
         return downloaded, skipped, failed
 
+    def close(self) -> None:
+        """Release the re-auth prompt thread."""
+        self._prompt_exec.shutdown(wait=False, cancel_futures=True)
+
     # ── Phase 1: Scraping ──────────────────────────────────────────────────
 
     async def _scrape_all(
         self, queue: asyncio.Queue, start_page: int
     ) -> int:
-        """Page through the listing with the main adapter; populate the queue."""
+        """Page through the listing with the main adapter; feed the queue."""
         adapter = self.scrape_adapter
         await adapter.navigate_to_documents()
 
@@ -124,23 +173,31 @@ class BulkDownloader:
         total = 0
 
         while True:
-            logger.info(f"Scraping listing page {page_num}…")
-            await self.db.set_last_page(page_num)
+            await self._session_ok.wait()
+            logger.info("Scraping listing page %d…", page_num)
 
             records = await adapter.get_documents_on_page(page_num)
-            logger.info(f"  Found {len(records)} record(s)")
+            has_next = await adapter.has_next_page()
+            # A login redirect also looks like an empty last page — don't
+            # mistake it for the end of the listing.
+            if (not records or not has_next) and await adapter.is_session_expired():
+                logger.warning("Session expired while scraping listing page %d.", page_num)
+                await self._handle_session_timeout()
+                await self._session_ok.wait()
+                await adapter.navigate_to_documents()
+                await adapter.go_to_listing_page(page_num)
+                continue
+
+            logger.info("  Found %d record(s)", len(records))
+            await self.db.set_last_page(page_num)
 
+            statuses = await self.db.register_documents_bulk(records)
             for record in records:
-                await self.db.register_document(
-                    record.id, record.employee_name, record.employee_id,
-                    record.doc_type, record.doc_date,
-                    record.listing_page, record.row_index,
-                )
-                if not await self.db.is_completed(record.id):
+                if statuses.get(record.id) != DownloadDB.STATUS_COMPLETED:
                     await queue.put(record)
                 total += 1
 
-            if not await adapter.has_next_page():
+            if not has_next:
                 break
             await adapter.go_to_next_page()
             page_num += 1
@@ -150,68 +207,69 @@ class BulkDownloader:
     # ── Phase 2: Worker coroutines ─────────────────────────────────────────
 
     async def _worker(
-        self, worker_id: int, queue: asyncio.Queue
+        self, worker_id: int, page: Page, queue: asyncio.Queue
     ) -> Tuple[int, int, int]:
         """
         Single download worker.  Owns its own Playwright Page + Adapter so
         it can navigate independently while sharing the session cookies.
+
+        Parks on ``queue.get()`` (no polling) until it takes the
+        ``_SENTINEL`` end marker off *queue*.
         """
         downloaded = skipped = failed = 0
-        log = logging.getLogger(f"{__name__}.w{worker_id}")
+        log = logger.getChild(f"w{worker_id}")
 
-        page = await self.context.new_page()
         adapter = self.adapter_class(self.config, page)
+        rng = random.Random()  # per-worker jitter source; no shared RNG state
 
         try:
             while True:
-                try:
-                    record = queue.get_nowait()
-                except asyncio.QueueEmpty:
-                    break
+                if self._requeued:
+                    record = self._requeued.pop()
+                else:
+                    record = await queue.get()
+                    if record is _SENTINEL:
+                        break
 
                 # Block here if another worker is handling re-authentication
                 await self._session_ok.wait()
 
                 # Another worker may have completed this while we were waiting
-                if await self.db.is_completed(record.id):
-                    log.debug(f"[SKIP] {record.id}")
+                if record.id in self._completed:
+                    log.debug("[SKIP] %s", record.id)
                     skipped += 1
-                    queue.task_done()
                     continue
 
                 # Acquire a rate-limit slot before downloading
                 await self.rate_limiter.acquire()
 
-                await self.db.mark_in_progress(record.id)
                 try:
                     path = await with_retry(
                         lambda rec=record: adapter.download_document(
                             rec, self.output_dir
                         ),
                         max_attempts=self.max_attempts,
-                        base_delay=self.retry_base_delay,
-                        max_delay=self.retry_max_delay,
+                        delays=self._retry_delays,
                         label=record.id,
                     )
                     await self.db.mark_completed(record.id, path)
-                    log.info(f"[OK]   {record.id} → {path}")
+                    self._completed.add(record.id)
+                    log.info("[OK]   %s → %s", record.id, path)
                     downloaded += 1
 
                 except Exception as exc:
                     # Check whether the failure was a session timeout
                     if await adapter.is_session_expired():
-                        log.warning(f"Session expired during {record.id} — triggering re-auth.")
-                        await self._handle_session_timeout(record, queue)
-                        queue.task_done()
+                        log.warning("Session expired during %s — triggering re-auth.", record.id)
+                        await self._handle_session_timeout(record)
                         continue
 
-                    log.error(f"[FAIL] {record.id}: {exc}")
+                    log.error("[FAIL] %s: %s", record.id, exc)
                     await self.db.mark_failed(record.id, str(exc))
                     failed += 1
 
                 # Randomised inter-download jitter to avoid bursty patterns
-                await asyncio.sleep(random.uniform(self.delay_min, self.delay_max))
-                queue.task_done()
+                await asyncio.sleep(rng.uniform(self.delay_min, self.delay_max))
 
         finally:
             await page.close()
@@ -221,28 +279,34 @@ class BulkDownloader:
     # ── Session timeout handling ───────────────────────────────────────────
 
     async def _handle_session_timeout(
-        self, record: DocumentRecord, queue: asyncio.Queue
+        self, record: Optional[DocumentRecord] = None
     ) -> None:
         """
-        Coordinate re-authentication across all workers.
-
-        Only one worker runs the re-auth prompt at a time (guarded by
-        _reauth_lock).  All other workers block on _session_ok until the
-        re-auth completes.  The triggering record is re-queued so it will
-        be retried once the session is restored.
+        Coordinate re-authentication across all workers and the scraper.
+
+        Only one caller runs the re-auth prompt; the rest block on
+        _session_ok until it completes.  Every worker that times out adds its
+        record to _reauth_pending (the scraper has none to add), and the prompting worker moves the whole
+        batch onto the retry list just before resuming the others.  The
+        worker that calls this keeps running, so the retry list is always
+        drained.
         """
+        if record is not None:
+            self._reauth_pending.setdefault(record.id, record)
+        if not self._session_ok.is_set():
+            # Another worker is already re-authenticating; it will re-queue
+            # our record along with its own.
+            return
+
+        # Clear before awaiting anything so concurrent detections see it
+        self._session_ok.clear()
         async with self._reauth_lock:
-            if self._session_ok.is_set():
-                # We are the first worker to detect the timeout — pause others
-                self._session_ok.clear()
-                logger.warning("Session timeout detected — pausing all workers.")
-                await self._prompt_reauth()
-                await queue.put(record)
-                self._session_ok.set()
-                logger.info("Session restored — workers resuming.")
-            else:
-                # Another worker is already handling re-auth; just re-queue
-                await queue.put(record)
+            logger.warning("Session timeout detected — pausing all workers.")
+            await self._prompt_reauth()
+            self._requeued.extend(self._reauth_pending.values())
+            self._reauth_pending.clear()
+            self._session_ok.set()
+            logger.info("Session restored — workers resuming.")
 
     async def _prompt_reauth(self) -> None:
         print()
@@ -252,8 +316,8 @@ class BulkDownloader:
         print("  When you are back on the authenticated home page,")
         print("  press ENTER here to resume all workers.")
         print("!" * 60)
-        await asyncio.get_event_loop().run_in_executor(
-            None, input, "  Press ENTER to resume... "
+        await asyncio.get_running_loop().run_in_executor(
+            self._prompt_exec, input, "  Press ENTER to resume... "
         )
         print()
         logger.info("User confirmed session restored.")
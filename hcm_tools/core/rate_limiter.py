@@ -1,20 +1,24 @@
-"""Async sliding-window rate limiter."""
+"""Async token-bucket rate limiter."""
 
 import asyncio
 import logging
 import time
-from collections import deque
 
 logger = logging.getLogger(__name__)
 
 
 class RateLimiter:
     """
-    Allows at most *max_calls* downloads within any rolling *window* seconds.
+    Allows on average *max_calls* downloads per *window* seconds.
+
+    Token bucket: the bucket holds up to *max_calls* tokens and refills
+    continuously at ``max_calls / window`` tokens per second.  Each download
+    consumes one token, so a burst of up to *max_calls* can start at once and
+    the long-run rate never exceeds the limit.
 
     All concurrent workers share a single instance.  Each worker calls
     ``await limiter.acquire()`` before starting a download; the call blocks
-    until a slot is available.
+    until a token is available.
     """
 
     def __init__(self, max_calls: int, window: float = 60.0):
@@ -22,33 +26,47 @@ class RateLimiter:
             raise ValueError("max_calls must be >= 1")
         self.max_calls = max_calls
         self.window = window
-        self._slots: deque[float] = deque()
+        self._rate = max_calls / window          # tokens per second
+        self._tokens: float = float(max_calls)
+        self._last_refill = time.monotonic()
         self._lock = asyncio.Lock()
 
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.max_calls),
+            self._tokens + (now - self._last_refill) * self._rate,
+        )
+        self._last_refill = now
+
     async def acquire(self) -> None:
-        """Block until a rate-limit slot is available, then claim it."""
+        """Block until a rate-limit token is available, then claim it."""
         async with self._lock:
-            now = time.monotonic()
+            self._refill()
+            # Claim the token now, even if that drives the bucket negative:
+            # the deficit tells each caller exactly when its token accrues.
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
 
-            # Drop timestamps that have aged out of the rolling window
-            while self._slots and self._slots[0] <= now - self.window:
-                self._slots.popleft()
-
-            if len(self._slots) >= self.max_calls:
-                # Oldest slot must expire before we can proceed
-                wait = (self._slots[0] + self.window) - now
-                if wait > 0:
-                    logger.debug(
-                        f"Rate limit ({self.max_calls}/{self.window:.0f}s): "
-                        f"sleeping {wait:.1f}s"
-                    )
-                    await asyncio.sleep(wait)
-                self._slots.popleft()
-
-            self._slots.append(time.monotonic())
+        # Sleep outside the lock so waiting workers don't queue up behind
+        # each other's sleeps — each one waits only for its own token.
+        if wait > 0:
+            logger.debug(
+                f"Rate limit ({self.max_calls}/{self.window:.0f}s): "
+                f"sleeping {wait:.1f}s"
+            )
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Give the reserved token back so the next caller doesn't
+                # inherit the cancelled waiter's debt.
+                async with self._lock:
+                    self._refill()
+                    self._tokens = min(float(self.max_calls), self._tokens + 1)
+                raise
 
     @property
-    def current_rate(self) -> int:
-        """Number of calls recorded in the current window (approximate)."""
-        now = time.monotonic()
-        return sum(1 for t in self._slots if t > now - self.window)
+    def available(self) -> float:
+        """Tokens currently in the bucket (approximate; negative while callers wait)."""
+        elapsed = time.monotonic() - self._last_refill
+        return min(float(self.max_calls), self._tokens + elapsed * self._rate)
@@ -9,6 +9,11 @@ from typing import TYPE_CHECKING, Any, Dict
 
 import click
 
+try:
+    import orjson  # optional: pip install hcm-tools[fast]
+except ImportError:
+    orjson = None
+
 if TYPE_CHECKING:
     from .db import DownloadDB
 
@@ -24,7 +29,10 @@ async def generate_report(
     Write a JSON summary and (if there are failures) a CSV of failed documents.
     Returns the summary dict.
     """
-    summary = await db.get_summary()
+    summary: Dict[str, Any] = await db.get_summary()
+    summary["failed_details"] = (
+        await db.get_failed_details() if summary["failed"] else []
+    )
 
     report_dir = Path(output_dir) / "reports"
     report_dir.mkdir(parents=True, exist_ok=True)
@@ -35,8 +43,11 @@ async def generate_report(
     # JSON summary
     json_path = report_dir / f"{stem}_summary.json"
     payload = {**summary, "system": system, "generated_at": ts}
-    # failed_details contains dicts — safe to serialise
-    json_path.write_text(json.dumps(payload, indent=2, default=str))
+    # failed_details contains plain dicts of str/int/None — safe to serialise
+    if orjson is not None:
+        json_path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+    else:
+        json_path.write_text(json.dumps(payload, indent=2, default=str))
     logger.info(f"Summary report  → {json_path}")
 
     # CSV of failures (only written when there are failures)
@@ -46,10 +57,14 @@ async def generate_report(
             "id", "employee_name", "employee_id",
             "doc_type", "doc_date", "attempts", "last_error",
         ]
-        with csv_path.open("w", newline="", encoding="utf-8") as fh:
-            writer = csv.DictWriter(fh, fieldnames=fields, extrasaction="ignore")
-            writer.writeheader()
-            writer.writerows(summary["failed_details"])
+        with csv_path.open("w", newline="", encoding="utf-8", buffering=1 << 16) as fh:
+            # Plain writer + prebuilt tuples: skips DictWriter's per-row
+            # dict-to-list mapping.
+            writer = csv.writer(fh)
+            writer.writerow(fields)
+            writer.writerows(
+                tuple(d.get(f) for f in fields) for d in summary["failed_details"]
+            )
         logger.info(f"Failure report  → {csv_path}")
 
     return summary
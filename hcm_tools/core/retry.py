@@ -3,13 +3,21 @@
 import asyncio
 import logging
 import random
-from typing import Awaitable, Callable, TypeVar
+from typing import Awaitable, Callable, List, Optional, Sequence, TypeVar
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
 
+def backoff_schedule(max_attempts: int, base_delay: float, max_delay: float) -> List[float]:
+    """
+    Un-jittered delays before attempts 2..*max_attempts*:
+    ``base_delay * 2^(n-1)`` for the n-th retry, capped at *max_delay*.
+    """
+    return [min(base_delay * (1 << i), max_delay) for i in range(max_attempts - 1)]
+
+
 async def with_retry(
     fn: Callable[[], Awaitable[T]],
     *,
@@ -18,6 +26,7 @@ async def with_retry(
     max_delay: float = 60.0,
     jitter: bool = True,
     label: str = "operation",
+    delays: Optional[Sequence[float]] = None,
 ) -> T:
     """
     Call async *fn* with exponential back-off on failure.
@@ -26,9 +35,15 @@ async def with_retry(
     With *jitter=True* each delay is scaled by a uniform factor in [0.5, 1.5]
     to spread load when many workers retry simultaneously.
 
+    Callers that retry many operations with the same settings can pass a
+    precomputed *delays* schedule (see ``backoff_schedule``); it must hold at
+    least ``max_attempts - 1`` entries and replaces *base_delay*/*max_delay*.
+
     Raises the last exception if all attempts are exhausted.
     """
     last_exc: Exception = RuntimeError("No attempts made")
+    if delays is None:
+        delays = backoff_schedule(max_attempts, base_delay, max_delay)
 
     for attempt in range(1, max_attempts + 1):
         try:
@@ -41,7 +56,7 @@ async def with_retry(
                 )
                 break
 
-            delay = min(base_delay * (2 ** (attempt - 1)), max_delay)
+            delay = delays[attempt - 1]
             if jitter:
                 delay *= 0.5 + random.random()  # 50 %–150 % of computed delay
 
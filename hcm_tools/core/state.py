@@ -1,13 +1,28 @@
 """Persistent download state — tracks completed/failed files for resume support."""
 
+import asyncio
+import atexit
 import json
 import logging
+import os
+import tempfile
+import threading
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
+
+try:
+    import orjson  # optional: pip install hcm-tools[fast]
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Default save_interval: minimum seconds between automatic saves (changes in
+# between stay in memory)
+_SAVE_INTERVAL = 2.0
+
 
 class DownloadState:
     """
@@ -22,12 +37,36 @@ class DownloadState:
         "completed": ["doc_id_1", "doc_id_2", ...],
         "failed": [{"id": "...", "error": "...", "time": "..."}]
     }
+
+    Mutations are written at most every *save_interval* seconds rather
+    than on every call; ``flush()`` forces a write and runs automatically
+    at interpreter exit unless ``close()`` was called first.  From async
+    code, ``flush_async()`` does the serialisation and file write in a
+    worker thread instead.
     """
 
-    def __init__(self, state_file: str, system: str = "unknown"):
+    def __init__(
+        self,
+        state_file: str,
+        system: str = "unknown",
+        save_interval: float = _SAVE_INTERVAL,
+    ):
         self.state_file = Path(state_file)
         self.system = system
+        self.save_interval = save_interval
         self._state = self._load()
+        # Source of truth for completed ids; _state["completed"] is only the
+        # list as loaded, and a sorted copy of this set is written instead.
+        self._completed = set(self._state["completed"])
+        self._dirty = False
+        self._changes = 0                 # bumped by every mutation
+        self._last_save = time.monotonic()
+        # Writes may come from a worker thread (flush_async); the lock and
+        # snapshot numbers keep an older snapshot from replacing a newer one.
+        self._write_lock = threading.Lock()
+        self._snapshot_seq = 0
+        self._written_seq = 0
+        atexit.register(self.flush)
 
     # ------------------------------------------------------------------
     # Persistence
@@ -57,12 +96,70 @@ class DownloadState:
         }
 
     def save(self) -> None:
+        changes = self._changes
+        self._write(*self._snapshot())
+        self._saved(changes)
+
+    def _snapshot(self) -> Tuple[int, dict]:
+        """Numbered copy of the state to write, detached from later changes."""
         self._state["updated_at"] = _now()
-        self.state_file.parent.mkdir(parents=True, exist_ok=True)
-        tmp = self.state_file.with_suffix(".tmp")
-        with tmp.open("w") as fh:
-            json.dump(self._state, fh, indent=2)
-        tmp.replace(self.state_file)  # atomic write
+        self._last_save = time.monotonic()
+        self._snapshot_seq += 1
+        return self._snapshot_seq, {
+            **self._state,
+            "completed": sorted(self._completed),
+            "failed": list(self._state["failed"]),
+        }
+
+    def _write(self, seq: int, state: dict) -> None:
+        if orjson is not None:
+            data = orjson.dumps(state, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(state, indent=2).encode()
+        with self._write_lock:
+            if seq < self._written_seq:
+                return  # a newer snapshot is already on disk
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(
+                dir=self.state_file.parent, prefix=self.state_file.name, suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(data)
+                os.replace(tmp, self.state_file)  # atomic write
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+            self._written_seq = seq
+
+    def _saved(self, changes: int) -> None:
+        # Only clean once the write succeeded, and only if nothing changed
+        # while it was in progress; a failed write leaves the state dirty.
+        if self._changes == changes:
+            self._dirty = False
+
+    def flush(self) -> None:
+        """Write pending changes to disk, if there are any."""
+        if self._dirty:
+            self.save()
+
+    def close(self) -> None:
+        """Write pending changes and drop the interpreter-exit hook."""
+        atexit.unregister(self.flush)
+        self.flush()
+
+    async def flush_async(self) -> None:
+        """Like ``flush()``, but encodes and writes the file in a worker thread."""
+        if self._dirty:
+            changes = self._changes
+            await asyncio.to_thread(self._write, *self._snapshot())
+            self._saved(changes)
+
+    def _changed(self) -> None:
+        self._dirty = True
+        self._changes += 1
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
 
     # ------------------------------------------------------------------
     # Public API
@@ -74,21 +171,21 @@ class DownloadState:
 
     def set_last_page(self, page: int) -> None:
         self._state["last_page"] = page
-        self.save()
+        self._changed()
 
     def is_completed(self, doc_id: str) -> bool:
-        return doc_id in self._state["completed"]
+        return doc_id in self._completed
 
     def mark_completed(self, doc_id: str) -> None:
-        if doc_id not in self._state["completed"]:
-            self._state["completed"].append(doc_id)
-        self.save()
+        if doc_id not in self._completed:
+            self._completed.add(doc_id)
+            self._changed()
 
     def mark_failed(self, doc_id: str, error: str) -> None:
         self._state["failed"].append(
             {"id": doc_id, "error": error, "time": _now()}
         )
-        self.save()
+        self._changed()
 
     def reset(self) -> None:
         """Wipe state and start fresh (does not delete the file)."""
@@ -100,13 +197,14 @@ class DownloadState:
             "completed": [],
             "failed": [],
         }
+        self._completed = set()
         self.save()
         logger.info("State reset.")
 
     @property
     def summary(self) -> dict:
         return {
-            "completed": len(self._state["completed"]),
+            "completed": len(self._completed),
             "failed": len(self._state["failed"]),
             "last_page": self.last_page,
         }
@@ -1,51 +1,160 @@
 """CLI entry point for HCM Tools."""
 
 import asyncio
+import atexit
+import importlib
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import tempfile
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping
 
 import click
 import yaml
 
-from .core.browser import BrowserSession
 from .core.db import DownloadDB
-from .core.downloader import BulkDownloader
 from .core.reporter import generate_report, print_summary
-from .adapters import REGISTRY
 
+try:
+    # LibYAML-backed loader: same output as SafeLoader, parsed in C
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
 
-def _load_config(system: str, config_path: str | None) -> dict:
+logger = logging.getLogger(__name__)
+
+# Parsed configs keyed by (resolved path, mtime_ns).  Entries are frozen (see
+# _freeze) so the shared objects can't be modified by callers.
+_CONFIG_CACHE: dict[tuple[str, int], Mapping[str, Any]] = {}
+
+
+def _load_config(system: str, config_path: str | None) -> Mapping[str, Any]:
     if config_path is None:
         config_path = f"config/{system}.yaml"
     path = Path(config_path)
     if not path.exists():
         click.echo(f"Config file not found: {path}", err=True)
         sys.exit(1)
-    with path.open() as fh:
-        return yaml.safe_load(fh)
 
+    key = (str(path.resolve()), path.stat().st_mtime_ns)
+    config = _CONFIG_CACHE.get(key)
+    if config is None:
+        config = _CONFIG_CACHE[key] = _freeze(_parse_config(path))
+    return config
+
+
+def _parse_config(path: Path) -> dict:
+    # A JSON copy of the parsed YAML is kept next to it and reused while it is
+    # at least as new as the YAML; json.loads is much cheaper than YAML parsing.
+    cache = path.with_suffix(path.suffix + ".cache.json")
+    try:
+        if cache.stat().st_mtime >= path.stat().st_mtime:
+            return json.loads(cache.read_bytes())
+    except (OSError, ValueError):
+        pass
+
+    config = yaml.load(path.read_bytes(), Loader=_Loader)
+    _write_config_cache(cache, config)
+    return config
+
+
+def _write_config_cache(cache: Path, config: dict) -> None:
+    # Only cache configs that survive a JSON round trip unchanged.  Values
+    # JSON can't represent (dates etc.) make dumps() raise, and non-string
+    # keys (1, true, null) would silently come back as strings.
+    try:
+        data = json.dumps(config)
+    except (TypeError, ValueError):
+        return
+    if json.loads(data) != config:
+        return
+    try:
+        fd, tmp = tempfile.mkstemp(dir=cache.parent, prefix=cache.name, suffix=".tmp")
+    except OSError:
+        return  # read-only config directory — parse the YAML every time
+    try:
+        with os.fdopen(fd, "w") as fh:
+            fh.write(data)
+        os.replace(tmp, cache)
+    except OSError:
+        Path(tmp).unlink(missing_ok=True)
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _setup_logging(log_dir: str, level: int) -> None:
+    # Embedded use (tests, batch runners): the host already configured
+    # logging, and adding our handlers again would duplicate every line.
+    if logging.getLogger().hasHandlers():
+        return
 
-def _setup_logging(log_dir: str, level: str) -> None:
     log_path = Path(log_dir)
-    log_path.mkdir(parents=True, exist_ok=True)
-    numeric = getattr(logging, level.upper(), logging.INFO)
+    if not log_path.exists():
+        log_path.mkdir(parents=True, exist_ok=True)
     fmt = "%(asctime)s [%(levelname)-8s] %(name)s — %(message)s"
-    logging.basicConfig(
-        level=numeric,
-        format=fmt,
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler(log_path / "hcm_tools.log"),
-        ],
+
+    # Records are handed to a background listener thread, so console and
+    # file writes never block the event loop.  The file is opened lazily.
+    formatter = logging.Formatter(fmt)
+    handlers: list[logging.Handler] = [
+        logging.StreamHandler(),
+        logging.FileHandler(log_path / "hcm_tools.log", delay=True),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
     )
+    listener.start()
+    atexit.register(listener.stop)
+
+    # The queue side only renders the message (and any traceback); the
+    # listener's handlers apply the full format.
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=level, handlers=[queue_handler])
+
+
+class LazySystemChoice(click.Choice):
+    """
+    click.Choice over the adapter REGISTRY, resolved on first use.
+
+    Importing the registry is deferred until Click needs the choices
+    (validation or --help), not paid when the module is imported.
+    """
+
+    def __init__(self) -> None:
+        # click.Choice.__init__ would assign self.choices, which is a
+        # read-only property here.
+        self.case_sensitive = True
+        self._choices: list[str] | None = None
+
+    @property
+    def choices(self) -> list[str]:
+        if self._choices is None:
+            from .adapters import REGISTRY
+            self._choices = sorted(REGISTRY)
+        return self._choices
 
 
 @click.command(context_settings={"help_option_names": ["-h", "--help"]})
 @click.option(
     "--system", "-s",
     required=True,
-    type=click.Choice(sorted(REGISTRY.keys())),
+    type=LazySystemChoice(),
     help="HRIS system to target.",
 )
 @click.option(
@@ -88,6 +197,8 @@ def _setup_logging(log_dir: str, level: str) -> None:
     default="INFO",
     show_default=True,
     type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False),
+    # Choice hands back the canonical upper-case name; pass on the int level
+    callback=lambda _ctx, _param, value: getattr(logging, value),
 )
 def cli(system, config, output, workers, resume, reset_state, log_dir, log_level):
     """
@@ -101,7 +212,17 @@ def cli(system, config, output, workers, resume, reset_state, log_dir, log_level
         hcm-tools --system adp_vantage --reset-state --log-level DEBUG
     """
     _setup_logging(log_dir, log_level)
-    asyncio.run(_run(system, config, output, workers, resume, reset_state, log_dir))
+    # uvloop (optional: pip install hcm-tools[fast]) is Linux/macOS only
+    loop_factory = None
+    if sys.platform != "win32":
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            loop_factory = uvloop.new_event_loop
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(_run(system, config, output, workers, resume, reset_state, log_dir))
 
 
 async def _run(
@@ -113,56 +234,96 @@ async def _run(
     reset_state: bool,
     log_dir: str,
 ) -> None:
-    logger = logging.getLogger(__name__)
+    # Playwright-backed modules are imported here rather than at module level
+    # so that --help and argument errors don't pay for loading them.  Only
+    # the selected adapter's module is imported, further down.
+    from .core.browser import BrowserSession
+    from .core.downloader import BulkDownloader
+    from .adapters import REGISTRY
+
+    # Python 3.12+: run new tasks eagerly until their first real suspension,
+    # so awaits that complete immediately skip a trip through the scheduler.
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
 
     config = _load_config(system, config_path)
 
+    # Overrides go into fresh dicts: the loaded config is shared and read-only
     if output_override:
-        config.setdefault("output", {})["directory"] = output_override
+        config = {
+            **config,
+            "output": {**config.get("output", {}), "directory": output_override},
+        }
     if workers_override is not None:
-        config.setdefault("concurrency", {})["workers"] = workers_override
+        config = {
+            **config,
+            "concurrency": {**config.get("concurrency", {}), "workers": workers_override},
+        }
+    # Re-freeze the rebuilt top level (already-frozen sections are kept as is)
+    config = _freeze(config)
 
     db_path = str(Path(log_dir) / f"{system}.db")
-    db = DownloadDB(db_path)
-    await db.open()
-
-    try:
-        if reset_state:
-            await db.reset()
-            logger.info("Database state reset — starting fresh.")
+    db_cfg = config.get("database", {})
+    db = DownloadDB(
+        db_path,
+        cache_size_mb=db_cfg.get("cache_size_mb", 64),
+        mmap_size_mb=db_cfg.get("mmap_size_mb", 256),
+        flush_interval=db_cfg.get("flush_interval", 0.5),
+        flush_every=db_cfg.get("flush_every", 50),
+    )
 
-        start_page = (await db.get_last_page()) if resume else 1
-        if resume:
-            logger.info(f"Resuming from listing page {start_page}")
+    # Opening the database and launching the browser are independent, so the
+    # SQLite setup runs in the background while Chromium starts.
+    db_ready = asyncio.create_task(_prepare_db(db, reset_state, resume))
 
+    try:
         browser_cfg = config.get("browser", {})
 
         async with BrowserSession(
             headless=browser_cfg.get("headless", False),
-            slow_mo=browser_cfg.get("slow_mo", 50),
+            slow_mo=browser_cfg.get("slow_mo", 0),
             viewport=browser_cfg.get("viewport"),
+            block_assets=browser_cfg.get("block_assets", False),
+            user_data_dir=browser_cfg.get("user_data_dir"),
         ) as session:
-            AdapterClass = REGISTRY[system]
+            start_page = await db_ready
+            module_path, cls_name = REGISTRY[system].split(":")
+            AdapterClass = getattr(importlib.import_module(module_path), cls_name)
 
             # The scraping adapter uses the main (login) page
             scrape_adapter = AdapterClass(config, session.page)
 
-            # Navigate to login
-            login_url = config.get("login_url") or config["base_url"]
-            await session.navigate(login_url)
+            # A persistent profile may still hold a valid session from a
+            # previous run — if the documents listing renders, skip the login
+            # pause.  The wait is kept short: an expired session never shows it.
+            logged_in = False
+            if browser_cfg.get("user_data_dir"):
+                logged_in = await scrape_adapter.has_active_session(
+                    config.get("session", {}).get("check_timeout", 10_000)
+                )
+                if logged_in:
+                    logger.info("Existing browser session is still valid — skipping login.")
+
+            if not logged_in:
+                # Navigate to login
+                login_url = config.get("login_url") or config["base_url"]
+                await session.navigate(login_url)
 
-            # Wait for human authentication
-            await session.pause_for_login()
+                # Wait for human authentication
+                await session.pause_for_login()
 
             # Hand off to the concurrent downloader
             downloader = BulkDownloader(
                 adapter_class=AdapterClass,
                 scrape_adapter=scrape_adapter,
-                context=session.context,
+                session=session,
                 db=db,
                 config=config,
             )
-            await downloader.run(start_page=start_page)
+            try:
+                await downloader.run(start_page=start_page)
+            finally:
+                downloader.close()
 
         # Generate and print the summary report
         output_dir = config.get("output", {}).get("directory", "output")
@@ -170,8 +331,28 @@ async def _run(
         print_summary(summary)
 
     finally:
+        if not db_ready.done():
+            # The browser failed to start before the database was ready.
+            # gather() still propagates a cancellation of _run itself.
+            db_ready.cancel()
+            await asyncio.gather(db_ready, return_exceptions=True)
+        if not db_ready.cancelled() and db_ready.exception() is not None:
+            logger.error("Database setup failed: %s", db_ready.exception())
         await db.close()
 
 
+async def _prepare_db(db: DownloadDB, reset_state: bool, resume: bool) -> int:
+    """Open the database, apply --reset-state, and return the start page."""
+    await db.open()
+    if reset_state:
+        await db.reset()
+        logger.info("Database state reset — starting fresh.")
+
+    start_page = (await db.get_last_page()) if resume else 1
+    if resume:
+        logger.info("Resuming from listing page %d", start_page)
+    return start_page
+
+
 if __name__ == "__main__":
     cli()